@@ -1,40 +1,55 @@
+from __future__ import annotations
+
 from datetime import datetime
 
 from airflow import DAG
 from airflow.models.param import Param
 from airflow.operators.python import PythonOperator
 
-from task_clean_contact import task_clean_contact
-from task_clean_delitos import task_clean_delitos
-from task_clean_renta import task_clean_renta
-from task_integration import task_integrate
+# Solo módulos ligeros al parsear el DAG: los task_* (pandas/pyarrow) se importan
+# dentro de cada callable, en el worker que ejecuta esa tarea
+from profiler import run_profiled
+
+
+def _profile_flag(context) -> bool | None:
+    # None -> decide ETL_PROFILE
+    return context.get("params", {}).get("profile")
+
+
+def load_raw_all(workers: int | None = None):
+    from task_load_raw import RawParquetLoader
+
+    RawParquetLoader(workers=workers).run(only="all")
+
+
+def load_raw_one(source: str, workers: int | None = None):
+    from task_load_raw import RawParquetLoader
 
-# Usa tu clase del loader
-from task_load_raw import RawParquetLoader
+    RawParquetLoader(workers=workers).run(only=source)
 
 
-def load_raw_all():
-    RawParquetLoader().run(only="all")
+def clean_renta_data(**context):
+    from task_clean_renta import task_clean_renta
 
+    return run_profiled("clean_renta", task_clean_renta, profile=_profile_flag(context))
 
-def load_raw_one(source: str):
-    RawParquetLoader().run(only=source)
 
+def clean_delitos_data(**context):
+    from task_clean_delitos import task_clean_delitos
 
-def clean_renta_data():
-    return task_clean_renta()
+    return run_profiled("clean_delitos", task_clean_delitos, profile=_profile_flag(context))
 
 
-def clean_delitos_data():
-    return task_clean_delitos()
+def clean_contact_data(**context):
+    from task_clean_contact import task_clean_contact
 
+    return run_profiled("clean_contact", task_clean_contact, profile=_profile_flag(context))
 
-def clean_contact_data():
-    return task_clean_contact()
 
+def final_integration_data(**context):
+    from task_integration import task_integrate
 
-def final_integration_data():
-    return task_integrate()
+    return run_profiled("final_integration", task_integrate, profile=_profile_flag(context))
 
 
 with DAG(
@@ -45,7 +60,11 @@ with DAG(
     catchup=False,
     default_args={"owner": "data-eng", "retries": 0},
     params={  # Permite elegir qué cargar al hacer Trigger
-        "source": Param("all", enum=["all", "renta", "delitos", "contact"])
+        "source": Param("all", enum=["all", "renta", "delitos", "contact"]),
+        # cProfile + tracemalloc por tarea; null -> usa ETL_PROFILE
+        "profile": Param(None, type=["null", "boolean"]),
+        # procesos de carga multi-fichero; null -> usa ETL_LOAD_WORKERS (1 por defecto)
+        "load_workers": Param(None, type=["null", "integer"], minimum=1),
     },
     tags=["etl", "raw"],
 ) as dag:
@@ -53,9 +72,11 @@ with DAG(
     # Tarea única que usa el parámetro 'source'
     def _load_router(**context):
         source = context["params"]["source"]
+        workers = context["params"].get("load_workers")
+        profile = _profile_flag(context)
         if source == "all":
-            return load_raw_all()
-        return load_raw_one(source)
+            return run_profiled("load_raw", load_raw_all, workers, profile=profile)
+        return run_profiled("load_raw", load_raw_one, source, workers, profile=profile)
 
     load_raw = PythonOperator(
         task_id="load_raw",
@@ -0,0 +1,219 @@
+"""Ejecuta el ETL fuera de Airflow.
+
+    python src/cli.py --stages load_raw,clean,integrate --sources contact --workers 4
+
+Las etapas independientes (carga y limpieza de cada fuente) corren en paralelo;
+al final se imprime el tiempo de cada etapa. `--workers` es el presupuesto total:
+por defecto se reparte entre etapas concurrentes y procesos de carga de cada una.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from profiler import run_profiled
+
+STAGES = ("load_raw", "clean", "integrate")
+SOURCES = ("renta", "delitos", "contact")
+ENGINES = ("memory", "streaming")
+FORMATS = ("table", "json")
+
+Plan = Dict[str, Tuple[Callable[[], object], List[str]]]
+
+log = logging.getLogger(__name__)
+
+
+def _csv_list(value: str, allowed: Sequence[str]) -> List[str]:
+    items = [v.strip() for v in value.split(",") if v.strip()]
+    if items == ["all"]:
+        return list(allowed)
+    bad = [v for v in items if v not in allowed]
+    if bad:
+        raise argparse.ArgumentTypeError(f"{', '.join(bad)} no válido; opciones: {allowed}")
+    return items
+
+
+def _load(source: str, workers: int, pipelined: bool) -> str:
+    from task_load_raw import RawParquetLoader
+
+    return RawParquetLoader(workers=workers, pipelined=pipelined).run(only=source)[source]
+
+
+def _clean(source: str) -> str:
+    # Import perezoso: solo se carga el módulo de la etapa que se ejecuta
+    module = importlib.import_module(f"task_clean_{source}")
+    return getattr(module, f"task_clean_{source}")()
+
+
+def _integrate(engine: str, workers: int) -> str:
+    from task_integration import task_integrate
+
+    return task_integrate(streaming=engine == "streaming", workers=workers)
+
+
+def build_plan(
+    stages: Sequence[str],
+    sources: Sequence[str],
+    load_workers: int = 1,
+    engine: str = "memory",
+    pipelined: bool = False,
+    integrate_workers: int = 1,
+) -> Plan:
+    """Etapas a ejecutar -> (callable, dependencias)."""
+    plan: Plan = {}
+    for src in sources:
+        if "load_raw" in stages:
+            plan[f"load_{src}"] = (partial(_load, src, load_workers, pipelined), [])
+        if "clean" in stages:
+            deps = [f"load_{src}"] if "load_raw" in stages else []
+            plan[f"clean_{src}"] = (partial(_clean, src), deps)
+    if "integrate" in stages:
+        deps = [f"clean_{src}" for src in sources if "clean" in stages]
+        plan["integrate"] = (partial(_integrate, engine, integrate_workers), deps)
+    return plan
+
+
+def _timed(name: str, fn: Callable[[], object]) -> Tuple[float, object]:
+    # Con ETL_PROFILE=1 cada etapa deja sus informes en output/profiles/, como en Airflow
+    t0 = time.perf_counter()
+    out = run_profiled(name, fn)
+    return time.perf_counter() - t0, out
+
+
+def run_plan(plan: Plan, workers: int = 1) -> Dict[str, dict]:
+    """Lanza cada etapa en cuanto terminan sus dependencias (hasta `workers` a la vez).
+
+    Si una etapa falla, las que dependen de ella se marcan como 'skipped'.
+    """
+    results: Dict[str, dict] = {}
+    pending = dict(plan)
+    running: dict = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        while pending or running:
+            for name, (fn, deps) in list(pending.items()):
+                states = [results.get(d, {}).get("status") for d in deps]
+                if any(s in ("failed", "skipped") for s in states):
+                    results[name] = {"status": "skipped", "seconds": 0.0, "output": None}
+                    del pending[name]
+                elif all(s == "ok" for s in states):
+                    running[ex.submit(_timed, name, fn)] = name
+                    del pending[name]
+            if not running:
+                # dependencias que no están en el plan: nada más puede arrancar
+                for name in pending:
+                    results[name] = {"status": "skipped", "seconds": 0.0, "output": None}
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                try:
+                    secs, out = fut.result()
+                    results[name] = {"status": "ok", "seconds": secs, "output": out}
+                except Exception as e:
+                    log.error("Etapa %s fallida:\n%s", name, traceback.format_exc())
+                    results[name] = {
+                        "status": "failed",
+                        "seconds": 0.0,
+                        "output": repr(e),
+                        "traceback": traceback.format_exc(),
+                    }
+    return results
+
+
+def _print_summary(results: Dict[str, dict], wall: float, fmt: str) -> None:
+    if fmt == "json":
+        print(json.dumps({"wall_seconds": wall, "stages": results}, indent=2, default=str))
+        return
+    width = max([len(n) for n in results] + [5])
+    print(f"{'etapa':<{width}}  {'estado':<7}  {'segundos':>9}  salida")
+    for name, r in results.items():
+        print(f"{name:<{width}}  {r['status']:<7}  {r['seconds']:>9.2f}  {r['output']}")
+    print(f"{'total':<{width}}  {'':<7}  {wall:>9.2f}")
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ETL contact center Madrid (sin Airflow)")
+    parser.add_argument(
+        "--stages",
+        type=lambda v: _csv_list(v, STAGES),
+        default=list(STAGES),
+        help=f"lista separada por comas de {STAGES} o 'all' (por defecto todas)",
+    )
+    parser.add_argument(
+        "--sources",
+        type=lambda v: _csv_list(v, SOURCES),
+        default=list(SOURCES),
+        help=f"fuentes a cargar/limpiar: {SOURCES} o 'all'",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="presupuesto total de workers (por defecto, nº de CPUs)",
+    )
+    parser.add_argument(
+        "--stage-workers",
+        type=int,
+        help="etapas en paralelo (por defecto min(3, --workers))",
+    )
+    parser.add_argument(
+        "--load-workers",
+        type=int,
+        help="procesos por etapa de carga multi-fichero (por defecto --workers / etapas)",
+    )
+    parser.add_argument(
+        "--engine", choices=ENGINES, default="memory", help="modo de la integración final"
+    )
+    parser.add_argument(
+        "--pipelined", action="store_true", help="solapa parseo CSV y escritura Parquet"
+    )
+    parser.add_argument("--format", choices=FORMATS, default="table", help="formato del resumen")
+    parser.add_argument("--data-in", help="directorio de CSV (DATA_IN_DIR)")
+    parser.add_argument("--data-out", help="directorio de salida (DATA_OUT_DIR)")
+    return parser.parse_args(argv)
+
+
+def _split_workers(args: argparse.Namespace) -> Tuple[int, int, int]:
+    # Reparte --workers: hasta 3 etapas concurrentes (una por fuente), cada carga con su
+    # parte de procesos; la integración corre sola al final y puede usar todo
+    total = max(1, args.workers)
+    stage = max(1, args.stage_workers or min(len(SOURCES), total))
+    load = max(1, args.load_workers or total // stage)
+    return stage, load, total
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    if args.data_in:
+        os.environ["DATA_IN_DIR"] = args.data_in
+    if args.data_out:
+        os.environ["DATA_OUT_DIR"] = args.data_out
+
+    stage_workers, load_workers, integrate_workers = _split_workers(args)
+    plan = build_plan(
+        args.stages,
+        args.sources,
+        load_workers=load_workers,
+        engine=args.engine,
+        pipelined=args.pipelined,
+        integrate_workers=integrate_workers,
+    )
+    t0 = time.perf_counter()
+    results = run_plan(plan, stage_workers)
+    _print_summary(results, time.perf_counter() - t0, args.format)
+    return 0 if all(r["status"] == "ok" for r in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
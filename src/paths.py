@@ -1,5 +1,7 @@
+import glob
 import os
 from pathlib import Path
+from typing import List
 
 
 # --- bases ---
@@ -34,6 +36,35 @@ def p_csv_contact() -> Path:
     return data_in_dir() / "contac_center_data.csv"
 
 
+# --- inputs múltiples (p. ej. un CSV de delitos por trimestre, contact por día) ---
+def _csv_inputs(env_var: str, default: Path) -> List[Path]:
+    # El env puede ser un fichero, un directorio (todos sus *.csv) o un patrón glob;
+    # las rutas relativas se resuelven contra data_in_dir()
+    spec = os.getenv(env_var)
+    if not spec:
+        return [default]
+    p = Path(spec)
+    if not p.is_absolute():
+        p = data_in_dir() / p
+    if p.is_dir():
+        return sorted(p.glob("*.csv"))
+    if glob.has_magic(str(p)):
+        return sorted(Path(f) for f in glob.glob(str(p)))
+    return [p]
+
+
+def csv_inputs_renta() -> List[Path]:
+    return _csv_inputs("DATA_IN_RENTA", p_csv_renta())
+
+
+def csv_inputs_delitos() -> List[Path]:
+    return _csv_inputs("DATA_IN_DELITOS", p_csv_delitos())
+
+
+def csv_inputs_contact() -> List[Path]:
+    return _csv_inputs("DATA_IN_CONTACT", p_csv_contact())
+
+
 # --- outputs: carpetas ---
 def raw_dir() -> Path:
     d = data_out_dir() / "raw"
@@ -53,6 +84,20 @@ def final_dir() -> Path:
     return d
 
 
+def cache_dir() -> Path:
+    # Caché de artefactos por contenido; ETL_CACHE_DIR permite compartirla entre runs
+    base = os.getenv("ETL_CACHE_DIR")
+    d = Path(base).resolve() if base else data_out_dir() / "cache"
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+def profile_dir() -> Path:
+    d = data_out_dir() / "profiles"
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
 # --- outputs: ficheros ---
 def p_raw_renta() -> Path:
     return raw_dir() / "renta_RAW.parquet"
@@ -66,6 +111,24 @@ def p_raw_contact() -> Path:
     return raw_dir() / "contact_RAW.parquet"
 
 
+# --- outputs: datasets RAW particionados (source_file=/period=) ---
+def p_raw_renta_dataset() -> Path:
+    return raw_dir() / "renta_RAW"
+
+
+def p_raw_delitos_dataset() -> Path:
+    return raw_dir() / "delitos_RAW"
+
+
+def p_raw_contact_dataset() -> Path:
+    return raw_dir() / "contact_RAW"
+
+
+def raw_input(single: Path, dataset: Path) -> Path:
+    # Los clean leen el dataset particionado si existe; si no, el parquet único
+    return dataset if dataset.is_dir() else single
+
+
 def p_clean_renta() -> Path:
     return clean_dir() / "renta_CLEAN.parquet"
 
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Optional, TypeVar
+
+from paths import profile_dir
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+TOP = 30
+
+# tracemalloc es global al proceso: con tareas concurrentes (CLI) se arranca con la
+# primera y se para con la última
+_trace_lock = threading.Lock()
+_trace_refs = 0
+_trace_owned = False
+
+
+def _acquire_tracing() -> None:
+    global _trace_refs, _trace_owned
+    with _trace_lock:
+        if _trace_refs == 0:
+            _trace_owned = not tracemalloc.is_tracing()
+            if _trace_owned:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        _trace_refs += 1
+
+
+def _release_tracing() -> None:
+    global _trace_refs, _trace_owned
+    with _trace_lock:
+        _trace_refs -= 1
+        if _trace_refs == 0 and _trace_owned:
+            tracemalloc.stop()
+            _trace_owned = False
+
+
+def profiling_enabled(flag: Optional[bool] = None) -> bool:
+    # El parámetro del DAG manda; si no viene, se usa ETL_PROFILE
+    if flag is not None:
+        return bool(flag)
+    return os.getenv("ETL_PROFILE", "0").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _hot_functions(prof: cProfile.Profile, top: int) -> str:
+    buf = io.StringIO()
+    stats = pstats.Stats(prof, stream=buf).strip_dirs()
+    buf.write("### por tiempo propio (tottime)\n")
+    stats.sort_stats("tottime").print_stats(top)
+    buf.write("### por tiempo acumulado (cumtime)\n")
+    stats.sort_stats("cumulative").print_stats(top)
+    return buf.getvalue()
+
+
+def _alloc_sites(snapshot: tracemalloc.Snapshot, top: int) -> list:
+    snapshot = snapshot.filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        )
+    )
+    return snapshot.statistics("lineno")[:top]
+
+
+def _write_reports(
+    name: str,
+    prof: cProfile.Profile,
+    snapshot: tracemalloc.Snapshot,
+    wall: float,
+    peak: int,
+    top: int,
+) -> Path:
+    base = profile_dir() / f"{name}-{time.strftime('%Y%m%dT%H%M%S')}"
+    prof.dump_stats(str(base) + ".prof")  # para snakeviz / pstats
+    Path(str(base) + ".hot.txt").write_text(_hot_functions(prof, top))
+    sites = _alloc_sites(snapshot, top)
+    Path(str(base) + ".alloc.txt").write_text("\n".join(str(s) for s in sites) + "\n")
+
+    # Resumen para el log de la tarea en Airflow
+    raw = pstats.Stats(prof).stats
+    hot = sorted(raw.items(), key=lambda kv: kv[1][2], reverse=True)[:5]
+    lines = [f"[profile] {name}: {wall:.2f}s, pico tracemalloc {peak / 2**20:.1f} MiB"]
+    for (fname, lineno, func), (_, ncalls, tottime, cumtime, _) in hot:
+        lines.append(
+            f"  {tottime:8.3f}s propio {cumtime:8.3f}s acum {ncalls:>9} llamadas  "
+            f"{func} ({Path(fname).name}:{lineno})"
+        )
+    for s in sites[:3]:
+        lines.append(f"  alloc {s}")
+    lines.append(f"  informes: {base}.{{prof,hot.txt,alloc.txt}}")
+    log.info("\n".join(lines))
+    return base
+
+
+def run_profiled(
+    name: str,
+    fn: Callable[..., T],
+    *args,
+    profile: Optional[bool] = None,
+    top: int = TOP,
+    **kwargs,
+) -> T:
+    """Ejecuta `fn` y, si el profiling está activo, la envuelve con cProfile + tracemalloc.
+
+    Escribe en output/profiles/ el .prof, las funciones más calientes y los
+    principales sitios de asignación, y deja un resumen en el log.
+    """
+    if not profiling_enabled(profile):
+        return fn(*args, **kwargs)
+
+    prof = cProfile.Profile()
+    _acquire_tracing()
+    try:
+        prof.enable()
+    except ValueError:
+        # Python >= 3.12 solo admite un profiler activo por proceso
+        _release_tracing()
+        log.warning("[profile] %s: ya hay otro profiler activo; se ejecuta sin perfilar", name)
+        return fn(*args, **kwargs)
+    t0 = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        prof.disable()
+        wall = time.perf_counter() - t0
+        # Un fallo escribiendo informes no debe tapar la excepción real de la tarea
+        try:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            _write_reports(name, prof, snapshot, wall, peak, top)
+        except Exception:
+            log.exception("[profile] %s: no se pudieron escribir los informes", name)
+        finally:
+            _release_tracing()
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+
+import paths
+from paths import cache_dir
+
+BLOCK = 1 << 20
+MAX_MB = 1024
+# Subir al cambiar el formato de los artefactos o la lógica común de la caché
+CACHE_VERSION = 1
+# Código compartido por todas las tareas que entra en la clave
+BASE_CODE = (Path(__file__), Path(paths.__file__))
+
+
+def version_tag() -> str:
+    return f"v{CACHE_VERSION}|pandas={pd.__version__}|pyarrow={pa.__version__}"
+
+
+def _enabled() -> bool:
+    return os.getenv("ETL_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def _max_bytes() -> int:
+    return int(float(os.getenv("ETL_CACHE_MAX_MB", MAX_MB)) * 1024 * 1024)
+
+
+def _iter_files(p: Path) -> Iterable[Path]:
+    # Un fichero, o todos los ficheros de un directorio (datasets RAW particionados)
+    if p.is_dir():
+        yield from sorted(f for f in p.rglob("*") if f.is_file())
+    else:
+        yield p
+
+
+def _update_file(h, f: Path) -> None:
+    with open(f, "rb") as fh:
+        for block in iter(lambda: fh.read(BLOCK), b""):
+            h.update(block)
+
+
+def cache_key(inputs: Sequence[Path], code: Sequence[Path] = (), tag: str = "") -> str:
+    """Hash de contenido de los inputs + código de la tarea + tag de versión."""
+    h = hashlib.sha256(tag.encode())
+    for group, members in (("in", inputs), ("code", code)):
+        for p in members:
+            p = Path(p)
+            for f in _iter_files(p):
+                rel = f.relative_to(p).as_posix() if p.is_dir() else f.name
+                h.update(f"{group}:{rel}\0".encode())
+                _update_file(h, f)
+    return h.hexdigest()
+
+
+def _tmp_for(p: Path) -> Path:
+    return p.with_name(f".{p.name}.{os.getpid()}.tmp")
+
+
+def _atomic_link(src: Path, dst: Path) -> None:
+    # Hardlink (O(1)) con fallback a copia; siempre temporal + rename
+    tmp = _tmp_for(dst)
+    try:
+        if tmp.exists():
+            tmp.unlink()
+        try:
+            os.link(src, tmp)
+        except OSError:
+            shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def _evict(keep: Path, max_bytes: int) -> None:
+    # LRU por mtime (se actualiza en cada hit); nunca borra el artefacto recién usado
+    entries = []
+    for f in cache_dir().iterdir():
+        if f.name.startswith(".") or not f.is_file():
+            continue
+        try:
+            st = f.stat()
+        except FileNotFoundError:  # desalojado por otra tarea concurrente
+            continue
+        entries.append((st.st_mtime, st.st_size, f))
+    total = sum(size for _, size, _ in entries)
+    for _, size, f in sorted(entries):
+        if total <= max_bytes:
+            break
+        if f == keep:
+            continue
+        try:
+            f.unlink()
+            total -= size
+        except FileNotFoundError:
+            pass
+
+
+def cached_artifact(
+    name: str,
+    inputs: Sequence[Path],
+    out: Path,
+    build: Callable[[Path], None],
+    code: Sequence[Path] = (),
+    tag: str = "",
+) -> str:
+    """Publica `out` desde la caché si los inputs no cambian; si no, lo construye.
+
+    `build(tmp)` escribe el artefacto en una ruta temporal que luego se renombra
+    sobre `out`, de modo que un fallo a mitad nunca deja la salida anterior borrada.
+    """
+    out.parent.mkdir(parents=True, exist_ok=True)
+
+    cached: Optional[Path] = None
+    if _enabled():
+        key = cache_key(inputs, code=[*BASE_CODE, *code], tag=f"{version_tag()}|{name}|{tag}")
+        cached = cache_dir() / f"{name}-{key[:32]}{out.suffix}"
+        try:
+            os.utime(cached)
+            _atomic_link(cached, out)
+            return str(out)
+        except FileNotFoundError:
+            pass  # no está (o se desalojó entre medias): miss
+
+    tmp = _tmp_for(out)
+    try:
+        build(tmp)
+        os.replace(tmp, out)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+    if cached is not None:
+        _atomic_link(out, cached)
+        _evict(cached, _max_bytes())
+    return str(out)
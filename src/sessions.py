@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Marca en los metadatos del parquet RAW: sessionID ya normalizado en la carga
+SESSION_META = b"etl.sessionID"
+NORMALIZED = b"normalized"
+
+
+def is_normalized(table: pa.Table) -> bool:
+    return (table.schema.metadata or {}).get(SESSION_META) == NORMALIZED
+
+
+def normalize_session_ids(table: pa.Table) -> pa.Table:
+    """Quita el envoltorio b'...' de sessionID con kernels Arrow (una sola pasada)."""
+    i = table.schema.get_field_index("sessionID")
+    if i < 0:
+        return table
+    col = table.column(i)
+    if not (pa.types.is_string(col.type) or pa.types.is_large_string(col.type)):
+        col = pc.cast(col, pa.large_string())
+    col = pc.utf8_trim_whitespace(pc.replace_substring_regex(col, r"^b'|'$", ""))
+    table = table.set_column(i, table.field(i).with_type(col.type), col)
+    return table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), SESSION_META: NORMALIZED}
+    )
+
+
+def session_keys(col: pa.ChunkedArray) -> Tuple[np.ndarray, pa.Array]:
+    """Claves int64 densas + diccionario clave -> sessionID.
+
+    Las claves siguen el orden de sessionID (no el de aparición), así que agrupar por
+    clave da la misma salida ordenada que el antiguo groupby por sessionID. Los nulos
+    se agrupan bajo "None", como hacía el antiguo astype(str).
+    """
+    enc = pc.dictionary_encode(col.combine_chunks().fill_null("None"))
+    order = pc.array_sort_indices(enc.dictionary).to_numpy()
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order), dtype=np.int64)
+    keys = rank[enc.indices.to_numpy(zero_copy_only=False)]
+    return keys, enc.dictionary.take(pa.array(order))
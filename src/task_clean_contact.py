@@ -5,8 +5,14 @@ from pathlib import Path
 from typing import Optional
 
 import pandas as pd
+import pyarrow as pa
 
-from paths import clean_dir, p_clean_contact, p_raw_contact
+import sessions
+import task_load_raw
+from paths import clean_dir, p_clean_contact, p_raw_contact, p_raw_contact_dataset, raw_input
+from result_cache import cached_artifact
+from sessions import is_normalized, normalize_session_ids, session_keys
+from task_load_raw import read_raw_table
 
 
 def _clean_cp(x) -> Optional[str]:
@@ -21,29 +27,18 @@ def _first_notna(s: pd.Series):
     return None
 
 
-def _safe_unlink(p: Path) -> None:
-    try:
-        if p.exists():
-            p.unlink()
-    except FileNotFoundError:
-        pass
-
-
-def task_clean_contact() -> str:
-    clean_dir().mkdir(parents=True, exist_ok=True)
-
-    df = pd.read_parquet(p_raw_contact())
-
-    # Limpiar sessionID b'...'
-    if "sessionID" not in df.columns:
+def _build_clean_contact(src: Path, dst: Path) -> None:
+    table = read_raw_table(src)
+    if "sessionID" not in table.column_names:
         raise KeyError("Falta columna 'sessionID' en contact RAW")
-    df["sessionID"] = (
-        df["sessionID"]
-        .astype(str)
-        .str.replace(r"^b'", "", regex=True)
-        .str.replace(r"'$", "", regex=True)
-        .str.strip()
-    )
+    # El loader ya limpia b'...'; solo se repite para RAW antiguos sin la marca
+    if not is_normalized(table):
+        table = normalize_session_ids(table)
+
+    # Agrupar/pivotar sobre claves int64 densas en vez de los sessionID (base64 largos)
+    keys, session_ids = session_keys(table.column("sessionID"))
+    df = table.drop(["sessionID"]).to_pandas()
+    df.insert(0, "session_key", keys)
 
     # Normalizar CP y duración
     if "CP" in df.columns:
@@ -55,16 +50,16 @@ def task_clean_contact() -> str:
     if "funnel_Q" in df.columns:
         df["_flag"] = 1
         wide = (
-            df.pivot_table(index="sessionID", columns="funnel_Q", values="_flag", aggfunc="max")
+            df.pivot_table(index="session_key", columns="funnel_Q", values="_flag", aggfunc="max")
             .fillna(0)
             .astype(int)
             .reset_index()
         )
     else:
-        wide = pd.DataFrame({"sessionID": df["sessionID"].drop_duplicates()})
+        wide = pd.DataFrame({"session_key": df["session_key"].drop_duplicates()})
 
     # Atributos de sesión
-    agg = df.groupby("sessionID", as_index=False).agg(
+    agg = df.groupby("session_key", as_index=False).agg(
         {
             "DNI": _first_notna if "DNI" in df.columns else _first_notna,
             "Telef": _first_notna if "Telef" in df.columns else _first_notna,
@@ -74,9 +69,22 @@ def task_clean_contact() -> str:
         }
     )
 
-    clean = agg.merge(wide, on="sessionID", how="left")
+    clean = agg.merge(wide, on="session_key", how="left")
+    # La clave es interna (depende del orden de aparición): se traduce de vuelta a
+    # sessionID con el diccionario (tabla lateral) y no se publica
+    clean.insert(
+        0, "sessionID", session_ids.take(pa.array(clean.pop("session_key").to_numpy())).to_pandas()
+    )
+    clean.to_parquet(dst, index=False)
+
 
-    out = p_clean_contact()
-    _safe_unlink(out)
-    clean.to_parquet(out, index=False)
-    return str(out)
+def task_clean_contact() -> str:
+    clean_dir().mkdir(parents=True, exist_ok=True)
+    src = raw_input(p_raw_contact(), p_raw_contact_dataset())
+    return cached_artifact(
+        "contact_CLEAN",
+        [src],
+        p_clean_contact(),
+        lambda tmp: _build_clean_contact(src, tmp),
+        code=[Path(__file__), Path(sessions.__file__), Path(task_load_raw.__file__)],
+    )
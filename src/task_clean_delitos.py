@@ -1,14 +1,16 @@
 import re
+from pathlib import Path
 
 import pandas as pd
 
-from paths import clean_dir, p_clean_delitos, p_raw_delitos
+import task_load_raw
+from paths import clean_dir, p_clean_delitos, p_raw_delitos, p_raw_delitos_dataset, raw_input
+from result_cache import cached_artifact
+from task_load_raw import read_raw
 
 
-def task_clean_delitos() -> str:
-    clean_dir().mkdir(parents=True, exist_ok=True)
-
-    df = pd.read_parquet(p_raw_delitos()).copy()
+def _build_clean_delitos(src: Path, dst: Path) -> None:
+    df = read_raw(src)
 
     # Normalizar municipio
     first_col = df.columns[0]
@@ -21,20 +23,38 @@ def task_clean_delitos() -> str:
     if not year_cols:
         clean = pd.DataFrame(columns=["municipio", "anio", "tipo_delito", "tasa"])
     else:
+        # Dataset multi-fichero (un CSV por trimestre): conservar la partición para deduplicar
+        parts = [c for c in ("period", "source_file") if c in df.columns]
         long = df.melt(
-            id_vars=["municipio"], value_vars=year_cols, var_name="anio", value_name="tasa"
+            id_vars=["municipio", *parts], value_vars=year_cols, var_name="anio", value_name="tasa"
         )
         long["anio"] = pd.to_numeric(long["anio"], errors="coerce").astype("Int64")
         long["tasa"] = pd.to_numeric(long["tasa"], errors="coerce")
         long["tipo_delito"] = "total"
+        if "period" in parts:
+            # Cada fichero trimestral repite la serie anual: queda la del periodo más reciente
+            long["_period"] = long["period"].astype(str).replace("unknown", "")
+            long = (
+                long.sort_values(["_period", *[c for c in parts if c != "period"]], kind="stable")
+                .drop_duplicates(subset=["municipio", "anio"], keep="last")
+                .sort_index()
+            )
         clean = (
             long[["municipio", "anio", "tipo_delito", "tasa"]]
             .dropna(subset=["anio"])
             .reset_index(drop=True)
         )
 
-    out = p_clean_delitos()
-    if out.exists():
-        out.unlink()
-    clean.to_parquet(out, index=False)
-    return str(out)
+    clean.to_parquet(dst, index=False)
+
+
+def task_clean_delitos() -> str:
+    clean_dir().mkdir(parents=True, exist_ok=True)
+    src = raw_input(p_raw_delitos(), p_raw_delitos_dataset())
+    return cached_artifact(
+        "delitos_CLEAN",
+        [src],
+        p_clean_delitos(),
+        lambda tmp: _build_clean_delitos(src, tmp),
+        code=[Path(__file__), Path(task_load_raw.__file__)],
+    )
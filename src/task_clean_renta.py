@@ -1,6 +1,11 @@
+from pathlib import Path
+
 import pandas as pd
 
-from paths import clean_dir, p_clean_renta, p_raw_renta
+import task_load_raw
+from paths import clean_dir, p_clean_renta, p_raw_renta, p_raw_renta_dataset, raw_input
+from result_cache import cached_artifact
+from task_load_raw import read_raw
 
 
 def _extract_cp_anywhere(s: pd.Series) -> pd.Series:
@@ -8,10 +13,11 @@ def _extract_cp_anywhere(s: pd.Series) -> pd.Series:
     return s.astype(str).str.extract(r"(\d{5})", expand=False).str.zfill(5)
 
 
-def task_clean_renta() -> str:
-    clean_dir().mkdir(parents=True, exist_ok=True)
-
-    df = pd.read_parquet(p_raw_renta()).copy()
+def _build_clean_renta(src: Path, dst: Path) -> None:
+    df = read_raw(src)
+    if src.is_dir():
+        # Particiones del dataset multi-fichero: fuera antes del fallback posicional
+        df = df.drop(columns=[c for c in ("source_file", "period") if c in df.columns])
 
     # Columnas típicas INE: "Municipios"; "Indicadores..."; "Periodo"; "Total" (o similar)
     cols = {c.lower(): c for c in df.columns}
@@ -60,8 +66,16 @@ def task_clean_renta() -> str:
     )
     clean["codigo_postal"] = clean["codigo_postal"].str.zfill(5)
 
-    out = p_clean_renta()
-    if out.exists():
-        out.unlink()
-    clean.to_parquet(out, index=False)
-    return str(out)
+    clean.to_parquet(dst, index=False)
+
+
+def task_clean_renta() -> str:
+    clean_dir().mkdir(parents=True, exist_ok=True)
+    src = raw_input(p_raw_renta(), p_raw_renta_dataset())
+    return cached_artifact(
+        "renta_CLEAN",
+        [src],
+        p_clean_renta(),
+        lambda tmp: _build_clean_renta(src, tmp),
+        code=[Path(__file__), Path(task_load_raw.__file__)],
+    )
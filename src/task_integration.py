@@ -1,19 +1,20 @@
 from __future__ import annotations
 
+import os
 import unicodedata
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
 
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 
 from paths import final_dir, p_clean_contact, p_clean_delitos, p_clean_renta, p_final_csv
+from result_cache import cached_artifact
 
-
-def _safe_unlink(p: Path) -> None:
-    try:
-        if p.exists():
-            p.unlink()
-    except FileNotFoundError:
-        pass
+BATCH_SIZE = 250_000
 
 
 def _norm_muni(x: str) -> str:
@@ -24,13 +25,7 @@ def _norm_muni(x: str) -> str:
     return x.strip().upper()
 
 
-def task_integrate() -> str:
-    final_dir().mkdir(parents=True, exist_ok=True)
-
-    contact = pd.read_parquet(p_clean_contact())
-    renta = pd.read_parquet(p_clean_renta())
-    delitos = pd.read_parquet(p_clean_delitos())
-
+def _renta_last(renta: pd.DataFrame) -> pd.DataFrame:
     # Renta reciente por CP
     renta_last = (
         renta.sort_values(["codigo_postal", "periodo"])
@@ -39,6 +34,25 @@ def task_integrate() -> str:
         .rename(columns={"codigo_postal": "CP"})
     )
     renta_last["municipio_norm"] = renta_last["municipio"].map(_norm_muni)
+    return renta_last
+
+
+def _int_dtypes(df: pd.DataFrame, gaps: bool) -> dict:
+    # Enteros numpy de una dimensión: un join left con filas sin cruce los pasa a float64.
+    # Por batches eso depende del batch; aquí se fija lo que haría el join completo
+    return {
+        c: np.dtype("float64") if gaps else df[c].dtype
+        for c in df.columns
+        if pd.api.types.is_integer_dtype(df[c]) and isinstance(df[c].dtype, np.dtype)
+    }
+
+
+def _build_integration(contact_p: Path, renta_p: Path, delitos_p: Path, dst: Path) -> None:
+    contact = pd.read_parquet(contact_p)
+    renta = pd.read_parquet(renta_p)
+    delitos = pd.read_parquet(delitos_p)
+
+    renta_last = _renta_last(renta)
 
     # Join contact + renta (por CP)
     merged = contact.merge(
@@ -54,7 +68,91 @@ def task_integrate() -> str:
         delitos[["municipio_norm", "anio", "tipo_delito", "tasa"]], on="municipio_norm", how="left"
     )
 
-    out = p_final_csv()
-    _safe_unlink(out)
-    final.to_csv(out, index=False)
-    return str(out)
+    final.to_csv(dst, index=False)
+
+
+def _build_integration_streaming(
+    contact_p: Path,
+    renta_p: Path,
+    delitos_p: Path,
+    dst: Path,
+    batch_size: int = BATCH_SIZE,
+    workers: int = 1,
+) -> None:
+    # Out-of-core: renta y delitos son pequeñas y se pre-unen en una dimensión por CP
+    # (broadcast); contact se recorre por batches Parquet y cada batch unido se añade
+    # al CSV. Mismo resultado (byte a byte) que _build_integration con memoria acotada.
+    delitos = pd.read_parquet(delitos_p)
+    delitos["municipio_norm"] = delitos["municipio"].map(_norm_muni)
+    renta_last = _renta_last(pd.read_parquet(renta_p))[
+        ["CP", "municipio", "municipio_norm", "periodo", "renta_media"]
+    ].rename(columns={"municipio": "municipio_renta", "periodo": "periodo_renta"})
+    delitos = delitos[["municipio_norm", "anio", "tipo_delito", "tasa"]]
+    dim = renta_last.merge(delitos, on="municipio_norm", how="left")
+
+    # Solo la columna CP de contact: ¿algún contacto se queda sin renta o sin delitos?
+    cp = pd.read_parquet(contact_p, columns=["CP"])["CP"]
+    norms = cp.map(renta_last.set_index("CP")["municipio_norm"])
+    dtypes = {
+        **_int_dtypes(renta_last, gaps=not cp.isin(renta_last["CP"]).all()),
+        **_int_dtypes(delitos, gaps=not norms.isin(delitos["municipio_norm"]).all()),
+    }
+
+    def _join(batch) -> pd.DataFrame:
+        return batch.to_pandas().merge(dim, on="CP", how="left").astype(dtypes)
+
+    contact_pf = pq.ParquetFile(contact_p)
+    batches = contact_pf.iter_batches(batch_size=batch_size)
+    with open(dst, "w", newline="", encoding="utf-8") as fh:
+        header = True
+
+        def _emit(part: pd.DataFrame) -> None:
+            nonlocal header
+            part.to_csv(fh, index=False, header=header)
+            header = False
+
+        if workers <= 1:
+            for batch in batches:
+                _emit(_join(batch))
+        else:
+            # Como mucho 2*workers batches en vuelo; se escriben en orden
+            pending: deque = deque()
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                for batch in batches:
+                    pending.append(ex.submit(_join, batch))
+                    if len(pending) >= 2 * workers:
+                        _emit(pending.popleft().result())
+                while pending:
+                    _emit(pending.popleft().result())
+
+        if header:
+            # contact vacío: solo cabecera
+            _emit(_join(contact_pf.schema_arrow.empty_table()))
+
+
+def _streaming_default() -> bool:
+    return os.getenv("ETL_INTEGRATION_STREAMING", "0").strip().lower() in ("1", "true", "yes")
+
+
+def task_integrate(
+    streaming: Optional[bool] = None, batch_size: int = BATCH_SIZE, workers: int = 1
+) -> str:
+    final_dir().mkdir(parents=True, exist_ok=True)
+    inputs = [p_clean_contact(), p_clean_renta(), p_clean_delitos()]
+    if streaming is None:
+        streaming = _streaming_default()
+
+    def build(tmp: Path) -> None:
+        if streaming:
+            _build_integration_streaming(*inputs, tmp, batch_size=batch_size, workers=workers)
+        else:
+            _build_integration(*inputs, tmp)
+
+    return cached_artifact(
+        "integration",
+        inputs,
+        p_final_csv(),
+        build,
+        code=[Path(__file__)],
+        tag=f"streaming={streaming}",
+    )
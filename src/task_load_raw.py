@@ -1,22 +1,37 @@
 from __future__ import annotations
 
+import multiprocessing
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from io import TextIOWrapper
 from pathlib import Path
-from typing import Dict, Iterable, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 import pandas as pd
 import pyarrow as pa
 import pyarrow.parquet as pq
 
 from paths import (
+    csv_inputs_contact,
+    csv_inputs_delitos,
+    csv_inputs_renta,
     p_csv_contact,
     p_csv_delitos,
     p_csv_renta,
     p_raw_contact,
+    p_raw_contact_dataset,
     p_raw_delitos,
+    p_raw_delitos_dataset,
     p_raw_renta,
+    p_raw_renta_dataset,
     raw_dir,
 )
+from sessions import normalize_session_ids
 
 CHUNKSIZE = 200_000
 ENC = "latin1"
@@ -31,13 +46,27 @@ def _safe_unlink(p: Path) -> None:
         pass
 
 
+def _safe_rmtree(p: Path) -> None:
+    if p.is_dir():
+        shutil.rmtree(p, ignore_errors=True)
+
+
+TableTransform = Callable[[pa.Table], pa.Table]
+
+
 def _parquet_stream_write(
-    df_iter: Iterable[pd.DataFrame], out_path: Path, compression="zstd", level=7
+    df_iter: Iterable[pd.DataFrame],
+    out_path: Path,
+    compression="zstd",
+    level=7,
+    transform: Optional[TableTransform] = None,
 ) -> None:
     writer: Optional[pq.ParquetWriter] = None
     try:
         for chunk in df_iter:
             table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if transform is not None:
+                table = transform(table)
             if writer is None:
                 writer = pq.ParquetWriter(
                     where=str(out_path),
@@ -52,8 +81,116 @@ def _parquet_stream_write(
             writer.close()
 
 
-def _read_csv_chunks_simple(path: Path) -> Iterable[pd.DataFrame]:
-    return pd.read_csv(path, sep=SEP, encoding=ENC, chunksize=CHUNKSIZE, low_memory=True)
+_DONE = object()
+
+
+def _parquet_stream_write_pipelined(
+    df_iter: Iterable[pd.DataFrame],
+    out_path: Path,
+    compression="zstd",
+    level=7,
+    queue_size: int = 2,
+    transform: Optional[TableTransform] = None,
+) -> Dict[str, float]:
+    # Igual que _parquet_stream_write, pero el parseo del CSV corre en un hilo productor:
+    # mientras se convierte/comprime el chunk N se parsea el N+1. La cola acotada
+    # (queue_size chunks) da backpressure y limita la memoria.
+    q: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+    stop = threading.Event()
+    errors: List[BaseException] = []
+    timings = {"parse": 0.0, "convert": 0.0, "write": 0.0, "wait": 0.0}
+
+    def _put(item) -> None:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _produce() -> None:
+        it = iter(df_iter)
+        try:
+            while not stop.is_set():
+                t0 = time.perf_counter()
+                try:
+                    chunk = next(it)
+                except StopIteration:
+                    break
+                timings["parse"] += time.perf_counter() - t0
+                _put(chunk)
+        except BaseException as e:  # se relanza en el hilo principal
+            errors.append(e)
+        finally:
+            _put(_DONE)
+
+    t_start = time.perf_counter()
+    producer = threading.Thread(target=_produce, name="csv-parse", daemon=True)
+    producer.start()
+    writer: Optional[pq.ParquetWriter] = None
+    try:
+        while True:
+            t0 = time.perf_counter()
+            chunk = q.get()
+            timings["wait"] += time.perf_counter() - t0
+            if chunk is _DONE:
+                break
+            t0 = time.perf_counter()
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if transform is not None:
+                table = transform(table)
+            timings["convert"] += time.perf_counter() - t0
+            t0 = time.perf_counter()
+            if writer is None:
+                writer = pq.ParquetWriter(
+                    where=str(out_path),
+                    schema=table.schema,
+                    compression=compression,
+                    compression_level=level,
+                    use_dictionary=True,
+                )
+            writer.write_table(table)
+            timings["write"] += time.perf_counter() - t0
+    finally:
+        stop.set()
+        producer.join()
+        if writer:
+            t0 = time.perf_counter()
+            writer.close()
+            timings["write"] += time.perf_counter() - t0
+    if errors:
+        raise errors[0]
+    timings["wall"] = time.perf_counter() - t_start
+    return timings
+
+
+def _write_parquet(
+    df_iter: Iterable[pd.DataFrame],
+    out_path: Path,
+    compression="zstd",
+    level=7,
+    pipelined: bool = False,
+    queue_size: int = 2,
+    transform: Optional[TableTransform] = None,
+) -> Dict[str, float]:
+    if pipelined:
+        return _parquet_stream_write_pipelined(
+            df_iter,
+            out_path,
+            compression=compression,
+            level=level,
+            queue_size=queue_size,
+            transform=transform,
+        )
+    t0 = time.perf_counter()
+    _parquet_stream_write(
+        df_iter, out_path, compression=compression, level=level, transform=transform
+    )
+    return {"wall": time.perf_counter() - t0}
+
+
+def _read_csv_chunks_simple(path: Path, chunksize: int = CHUNKSIZE) -> Iterable[pd.DataFrame]:
+    return pd.read_csv(path, sep=SEP, encoding=ENC, chunksize=chunksize, low_memory=True)
 
 
 def _find_delitos_header_index(fh: TextIOWrapper, max_scan: int = 300) -> int:
@@ -71,7 +208,7 @@ def _find_delitos_header_index(fh: TextIOWrapper, max_scan: int = 300) -> int:
     return header_idx
 
 
-def _read_csv_chunks_delitos(path: Path) -> Iterable[pd.DataFrame]:
+def _read_csv_chunks_delitos(path: Path, chunksize: int = CHUNKSIZE) -> Iterable[pd.DataFrame]:
     # Maneja metadatos previos en el CSV oficial
     with open(path, "r", encoding=ENC, errors="replace") as f:
         header_idx = _find_delitos_header_index(f)
@@ -81,54 +218,245 @@ def _read_csv_chunks_delitos(path: Path) -> Iterable[pd.DataFrame]:
         encoding=ENC,
         engine="python",
         skiprows=header_idx,
-        chunksize=CHUNKSIZE,
+        chunksize=chunksize,
         low_memory=True,
     )
 
 
+_READERS = {
+    "renta": _read_csv_chunks_simple,
+    "delitos": _read_csv_chunks_delitos,
+    "contact": _read_csv_chunks_simple,
+}
+
+# Transformaciones Arrow por fuente aplicadas a cada chunk antes de escribir
+_TRANSFORMS: Dict[str, TableTransform] = {
+    "contact": normalize_session_ids,
+}
+
+
+def _period_from_name(name: str) -> str:
+    # "delitos_2024T1.csv" -> "2024T1", "contact_2024-03-15.csv" -> "2024-03-15"
+    m = re.search(r"\d{4}(?:[-_]?(?:[TQ][1-4]|\d{2}(?:[-_]?\d{2})?))?", Path(name).stem, re.I)
+    return m.group(0).upper() if m else "unknown"
+
+
+def _fragment_names(files: List[Path]) -> List[str]:
+    # Valor de la partición source_file: ruta relativa a la raíz común, para que
+    # "*/contact.csv" no haga colisionar ficheros con el mismo nombre
+    if len(files) == 1:
+        return [files[0].name]
+    root = Path(os.path.commonpath([str(f.resolve().parent) for f in files]))
+    names = [f.resolve().relative_to(root).as_posix().replace("/", "__") for f in files]
+    dupes = sorted({n for n in names if names.count(n) > 1})
+    if dupes:
+        raise ValueError(f"CSV de entrada con el mismo nombre de fragmento: {dupes}")
+    return names
+
+
+def _unify_type(types: List[pa.DataType]) -> pa.DataType:
+    types = list({t for t in types if not pa.types.is_null(t)})
+    if not types:
+        return pa.null()
+    if len(types) == 1:
+        return types[0]
+    if all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in types):
+        return pa.float64()
+    return pa.large_string()
+
+
+def read_raw_table(path: Path) -> pa.Table:
+    """Lee un RAW: parquet único o dataset multi-fichero con esquemas unificados.
+
+    Cada CSV se escribe con el esquema que infiere pandas, así que los fragmentos
+    pueden diferir (columnas nuevas, Producto vacío=double en un día y texto en otro).
+    Se usa la unión de columnas; los tipos en conflicto pasan a float64 si todos son
+    numéricos y a string si no. Las particiones quedan como columnas al final.
+    """
+    if not path.is_dir():
+        return pq.read_table(path)
+    frags = sorted(path.rglob("*.parquet"))
+    if not frags:
+        raise FileNotFoundError(f"Dataset RAW vacío: {path}")
+    part_cols = [p.partition("=")[0] for p in frags[0].parent.relative_to(path).parts]
+    tables = []
+    for f in frags:
+        t = pq.read_table(f)
+        for part in f.parent.relative_to(path).parts:
+            key, _, value = part.partition("=")
+            t = t.append_column(key, pa.array([value] * t.num_rows, pa.string()))
+        tables.append(t)
+
+    names: List[str] = []
+    for t in tables:
+        names += [n for n in t.column_names if n not in names and n not in part_cols]
+    names += part_cols
+    types = {
+        n: _unify_type([t.schema.field(n).type for t in tables if n in t.column_names])
+        for n in names
+    }
+    aligned = [
+        pa.table(
+            [
+                (
+                    t.column(n).cast(types[n])
+                    if n in t.column_names
+                    else pa.nulls(t.num_rows, types[n])
+                )
+                for n in names
+            ],
+            names=names,
+        )
+        for t in tables
+    ]
+    # Metadatos comunes a todos los fragmentos (p. ej. la marca de sessionID); los de
+    # pandas se descartan porque describen tipos que pueden haber cambiado
+    metas = [t.schema.metadata or {} for t in tables]
+    common = {
+        k: v for k, v in metas[0].items() if k != b"pandas" and all(m.get(k) == v for m in metas)
+    }
+    return pa.concat_tables(aligned).replace_schema_metadata(common)
+
+
+def read_raw(path: Path) -> pd.DataFrame:
+    return read_raw_table(path).to_pandas()
+
+
+def _write_fragment(
+    source: str,
+    csv_path: Path,
+    dataset_dir: Path,
+    name: str,
+    chunksize: int = CHUNKSIZE,
+    compression: str = "zstd",
+    level: int = 7,
+    pipelined: bool = False,
+    queue_size: int = 2,
+) -> Tuple[str, Dict[str, float]]:
+    # Un CSV -> un fragmento del dataset RAW (particiones hive source_file=/period=).
+    # Función de módulo para poder ejecutarse en un ProcessPoolExecutor.
+    frag_dir = dataset_dir / f"source_file={name}" / f"period={_period_from_name(name)}"
+    frag_dir.mkdir(parents=True, exist_ok=True)
+    out = frag_dir / "part-0.parquet"
+    timings = _write_parquet(
+        _READERS[source](csv_path, chunksize),
+        out,
+        compression=compression,
+        level=level,
+        pipelined=pipelined,
+        queue_size=queue_size,
+        transform=_TRANSFORMS.get(source),
+    )
+    return str(out), timings
+
+
 class RawParquetLoader:
     def __init__(
-        self, chunksize: int = CHUNKSIZE, compression: str = "zstd", compression_level: int = 7
+        self,
+        chunksize: int = CHUNKSIZE,
+        compression: str = "zstd",
+        compression_level: int = 7,
+        workers: Optional[int] = None,
+        pipelined: bool = False,
+        queue_size: int = 2,
     ) -> None:
         self.chunksize = chunksize
         self.compression = compression
         self.compression_level = compression_level
+        # Procesos para la carga multi-fichero; por defecto ETL_LOAD_WORKERS (o 1)
+        self.workers = workers if workers is not None else int(os.getenv("ETL_LOAD_WORKERS", "1"))
+        self.pipelined = pipelined
+        self.queue_size = queue_size
+        # Tiempos por fuente y etapa (parse/convert/write/wait/wall) del último run
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    def _write_fragments(
+        self, source: str, files: List[Path], dataset_dir: Path
+    ) -> List[Tuple[str, Dict[str, float]]]:
+        args = [
+            (
+                source,
+                f,
+                dataset_dir,
+                name,
+                self.chunksize,
+                self.compression,
+                self.compression_level,
+                self.pipelined,
+                self.queue_size,
+            )
+            for f, name in zip(files, _fragment_names(files))
+        ]
+        if self.workers <= 1 or len(files) == 1:
+            return [_write_fragment(*a) for a in args]
+        # Nunca fork: si el loader corre en un hilo (CLI) mientras otros usan pandas/pyarrow,
+        # el hijo puede heredar un lock tomado y quedarse colgado
+        method = (
+            "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        )
+        ctx = multiprocessing.get_context(method)
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(files)), mp_context=ctx) as ex:
+            futures = [ex.submit(_write_fragment, *a) for a in args]
+            return [f.result() for f in futures]
+
+    def _build(
+        self, source: str, files: List[Path], default_csv: Path, out: Path, dataset_dir: Path
+    ) -> str:
+        # Validar antes de borrar: un glob mal escrito no debe llevarse el último RAW bueno
+        if not files:
+            raise FileNotFoundError(f"No hay CSV de entrada para '{source}'")
+        missing = [str(f) for f in files if not f.is_file()]
+        if missing:
+            raise FileNotFoundError(f"CSV de entrada no encontrados para '{source}': {missing}")
+        _fragment_names(files)  # nombres de fragmento duplicados -> error antes de borrar
 
-    def build_renta_raw(self) -> str:
-        out = p_raw_renta()
         out.parent.mkdir(parents=True, exist_ok=True)
         _safe_unlink(out)
-        _parquet_stream_write(
-            _read_csv_chunks_simple(p_csv_renta()),
-            out,
-            compression=self.compression,
-            level=self.compression_level,
+        _safe_rmtree(dataset_dir)
+
+        # Modo clásico: un único CSV en la ruta por defecto -> un parquet
+        if files == [default_csv]:
+            self.timings[source] = _write_parquet(
+                _READERS[source](default_csv, self.chunksize),
+                out,
+                compression=self.compression,
+                level=self.compression_level,
+                pipelined=self.pipelined,
+                queue_size=self.queue_size,
+                transform=_TRANSFORMS.get(source),
+            )
+            return str(out)
+
+        # Modo multi-fichero: un fragmento por CSV dentro de un dataset particionado
+        totals: Dict[str, float] = {}
+        for _, timings in self._write_fragments(source, files, dataset_dir):
+            for stage, secs in timings.items():
+                totals[stage] = totals.get(stage, 0.0) + secs
+        self.timings[source] = totals
+        return str(dataset_dir)
+
+    def build_renta_raw(self) -> str:
+        return self._build(
+            "renta", csv_inputs_renta(), p_csv_renta(), p_raw_renta(), p_raw_renta_dataset()
         )
-        return str(out)
 
     def build_delitos_raw(self) -> str:
-        out = p_raw_delitos()
-        out.parent.mkdir(parents=True, exist_ok=True)
-        _safe_unlink(out)
-        _parquet_stream_write(
-            _read_csv_chunks_delitos(p_csv_delitos()),
-            out,
-            compression=self.compression,
-            level=self.compression_level,
+        return self._build(
+            "delitos",
+            csv_inputs_delitos(),
+            p_csv_delitos(),
+            p_raw_delitos(),
+            p_raw_delitos_dataset(),
         )
-        return str(out)
 
     def build_contact_raw(self) -> str:
-        out = p_raw_contact()
-        out.parent.mkdir(parents=True, exist_ok=True)
-        _safe_unlink(out)
-        _parquet_stream_write(
-            _read_csv_chunks_simple(p_csv_contact()),
-            out,
-            compression=self.compression,
-            level=self.compression_level,
+        return self._build(
+            "contact",
+            csv_inputs_contact(),
+            p_csv_contact(),
+            p_raw_contact(),
+            p_raw_contact_dataset(),
         )
-        return str(out)
 
     def run(self, only: str = "all") -> Dict[str, str]:
         raw_dir().mkdir(parents=True, exist_ok=True)
@@ -142,5 +470,5 @@ class RawParquetLoader:
         return out
 
 
-def task_load_raw() -> dict:
-    return RawParquetLoader().run("all")
+def task_load_raw(workers: Optional[int] = None) -> dict:
+    return RawParquetLoader(workers=workers).run("all")
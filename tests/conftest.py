@@ -0,0 +1,35 @@
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def data_in(tmp_path: Path) -> Path:
+    """Directorio con los tres CSV mínimos (renta, delitos, contact) en formato original."""
+    data_in = tmp_path / "data"
+    data_in.mkdir(parents=True, exist_ok=True)
+
+    (data_in / "renta_por_hogar.csv").write_text(
+        "Municipios;Indicadores de renta media y mediana;Periodo;Total\n"
+        "28001 Acebeda, La;Renta neta media por persona;2020;13.999\n"
+        "28002 Ajalvir;Renta neta media por persona;2020;15.500\n",
+        encoding="latin1",
+    )
+    (data_in / "delitos_por_municipio.csv").write_text(
+        "Balance de criminalidad 2020 - 1er trimestre\n"
+        "Unidades: Tasas\n"
+        "Notas adicionales\n"
+        "Municipio;2019;2020;2021\n"
+        "MADRID (COMUNIDAD DE);100;110;120\n"
+        "ALCALÁ DE HENARES;30;28;35\n",
+        encoding="latin1",
+    )
+    (data_in / "contac_center_data.csv").write_text(
+        "sessionID;DNI;Telef;CP;duration_call_mins;funnel_Q;Producto\n"
+        "b'AAA';X1;600000001;28001;2.5;Chalet;\n"
+        "b'AAA';X1;600000001;28001;2.5;Unifamiliar;\n"
+        "b'AAA';X1;600000001;28001;2.5;Sin Rejas;Seguro Hogar\n"
+        "b'BBB';Y2;600000002;28002;3.1;Piso;\n",
+        encoding="latin1",
+    )
+    return data_in
@@ -32,3 +32,106 @@ def test_task_clean_contact(tmp_path, monkeypatch):
     }  # según limpieza
     # Tiene columnas pivotadas (al menos una)
     assert any(col in clean.columns for col in ["Chalet", "Unifamiliar", "Sin Rejas", "Piso"])
+
+
+def test_clean_contact_integer_session_keys(tmp_path, monkeypatch):
+    import pyarrow.parquet as pq
+
+    from sessions import is_normalized
+    from task_load_raw import RawParquetLoader
+
+    data_in = tmp_path / "data"
+    data_in.mkdir()
+    (data_in / "contac_center_data.csv").write_text(
+        "sessionID;DNI;Telef;CP;duration_call_mins;funnel_Q;Producto\n"
+        "b'QUFB';X1;600;28001;2.5;Chalet;x\n"
+        "b'QkJC';Y2;700;28002;3.1;Piso;y\n"
+        "b'QUFB';X1;600;28001;2.5;Sin Rejas;x\n",
+        encoding="latin1",
+    )
+    monkeypatch.setenv("DATA_IN_DIR", str(data_in))
+    monkeypatch.setenv("DATA_OUT_DIR", str(tmp_path / "output"))
+
+    raw_path = RawParquetLoader().run(only="contact")["contact"]
+    raw = pq.read_table(raw_path)
+    assert is_normalized(raw)
+    assert raw.column("sessionID").to_pylist() == ["QUFB", "QkJC", "QUFB"]
+
+    clean = pd.read_parquet(task_clean_contact())
+    # la clave entera es interna: el esquema publicado sigue empezando por sessionID
+    assert "session_key" not in clean.columns
+    assert clean.columns[0] == "sessionID"
+    assert clean["sessionID"].tolist() == ["QUFB", "QkJC"]
+    assert clean["Chalet"].tolist() == [1, 0]
+
+
+def test_clean_contact_null_session_ids_grouped_as_none(tmp_path, monkeypatch):
+    d = tmp_path / "data"
+    d.mkdir(parents=True, exist_ok=True)
+    monkeypatch.setenv("DATA_DIR", str(d))
+
+    pd.DataFrame(
+        {
+            "sessionID": ["b'AAA'", None, None],
+            "DNI": ["X1", "Y2", "Y2"],
+            "Telef": ["600", "700", "700"],
+            "CP": ["28001", "28002", "28002"],
+            "duration_call_mins": [2.5, 3.1, 3.1],
+            "funnel_Q": ["Chalet", "Piso", "Chalet"],
+            "Producto": [None, None, None],
+        }
+    ).to_parquet(p_raw_contact(), index=False)
+
+    clean = pd.read_parquet(task_clean_contact())
+    # como el antiguo astype(str): las filas sin sessionID quedan bajo "None"
+    assert clean["sessionID"].tolist() == ["AAA", "None"]
+    assert clean.set_index("sessionID").loc["None", "Piso"] == 1
+
+
+def test_clean_contact_daily_files_with_different_producto_types(tmp_path, monkeypatch):
+    from task_load_raw import RawParquetLoader
+
+    drops = tmp_path / "data" / "contact"
+    drops.mkdir(parents=True)
+    header = "sessionID;DNI;Telef;CP;duration_call_mins;funnel_Q;Producto\n"
+    # Producto vacío todo el día -> pandas lo infiere como double; al día siguiente, texto
+    (drops / "contact_2024-03-14.csv").write_text(
+        header + "b'AAA';X1;600;28001;2.5;Chalet;\n", encoding="latin1"
+    )
+    (drops / "contact_2024-03-15.csv").write_text(
+        header + "b'BBB';Y2;700;28002;3.1;Piso;Seguro Hogar\n", encoding="latin1"
+    )
+    monkeypatch.setenv("DATA_IN_DIR", str(tmp_path / "data"))
+    monkeypatch.setenv("DATA_OUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setenv("DATA_IN_CONTACT", "contact")
+
+    RawParquetLoader().run(only="contact")
+    clean = pd.read_parquet(task_clean_contact()).set_index("sessionID")
+
+    assert sorted(clean.index) == ["AAA", "BBB"]
+    assert clean.loc["BBB", "Producto"] == "Seguro Hogar"
+    assert pd.isna(clean.loc["AAA", "Producto"])
+
+
+def test_clean_contact_output_sorted_by_session_id(tmp_path, monkeypatch):
+    d = tmp_path / "data"
+    d.mkdir(parents=True, exist_ok=True)
+    monkeypatch.setenv("DATA_DIR", str(d))
+
+    pd.DataFrame(
+        {
+            "sessionID": ["b'ZZZ'", "b'AAA'", "b'MMM'", "b'ZZZ'"],
+            "DNI": ["Z", "A", "M", "Z"],
+            "Telef": ["600", "700", "800", "600"],
+            "CP": ["28003", "28001", "28002", "28003"],
+            "duration_call_mins": [1.0, 2.0, 3.0, 1.0],
+            "funnel_Q": ["Chalet", "Piso", "Chalet", "Sin Rejas"],
+            "Producto": [None, "x", None, "y"],
+        }
+    ).to_parquet(p_raw_contact(), index=False)
+
+    clean = pd.read_parquet(task_clean_contact())
+    # mismo orden que el antiguo groupby por sessionID, no el de aparición
+    assert clean["sessionID"].tolist() == ["AAA", "MMM", "ZZZ"]
+    assert clean["DNI"].tolist() == ["A", "M", "Z"]
+    assert clean["Chalet"].tolist() == [0, 1, 1]
@@ -29,3 +29,53 @@ def test_task_clean_delitos_basic(tmp_path, monkeypatch):
     assert set(["municipio", "anio", "tipo_delito", "tasa"]).issubset(clean.columns)
     assert set(clean["anio"]) == {2019, 2020}
     assert (clean["tipo_delito"] == "total").all()
+
+
+def test_task_clean_delitos_quarterly_files_keep_latest_period(tmp_path, monkeypatch):
+    from task_load_raw import RawParquetLoader
+
+    drops = tmp_path / "data" / "delitos"
+    drops.mkdir(parents=True)
+    for quarter, madrid in (("2020T1", 100), ("2020T2", 105)):
+        (drops / f"delitos_{quarter}.csv").write_text(
+            f"Balance de criminalidad {quarter}\n"
+            "Municipio;2019;2020\n"
+            f"MADRID;90;{madrid}\n"
+            "ALCALA;30;28\n",
+            encoding="latin1",
+        )
+    monkeypatch.setenv("DATA_IN_DIR", str(tmp_path / "data"))
+    monkeypatch.setenv("DATA_OUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setenv("DATA_IN_DELITOS", "delitos")
+
+    RawParquetLoader().run(only="delitos")
+    clean = pd.read_parquet(task_clean_delitos())
+
+    assert list(clean.columns) == ["municipio", "anio", "tipo_delito", "tasa"]
+    assert not clean.duplicated(["municipio", "anio"]).any()
+    assert len(clean) == 4
+    madrid_2020 = clean[(clean["municipio"] == "MADRID") & (clean["anio"] == 2020)]
+    assert madrid_2020["tasa"].tolist() == [105.0]
+
+
+def test_task_clean_delitos_quarter_with_new_year_column(tmp_path, monkeypatch):
+    from task_load_raw import RawParquetLoader
+
+    drops = tmp_path / "data" / "delitos"
+    drops.mkdir(parents=True)
+    (drops / "delitos_2023T4.csv").write_text(
+        "Municipio;2022;2023\nMADRID;90;95\n", encoding="latin1"
+    )
+    (drops / "delitos_2024T1.csv").write_text(
+        "Municipio;2022;2023;2024\nMADRID;90;96;20\n", encoding="latin1"
+    )
+    monkeypatch.setenv("DATA_IN_DIR", str(tmp_path / "data"))
+    monkeypatch.setenv("DATA_OUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setenv("DATA_IN_DELITOS", "delitos")
+
+    RawParquetLoader().run(only="delitos")
+    clean = pd.read_parquet(task_clean_delitos())
+
+    # la columna 2024 solo existe en el segundo fragmento y no se pierde al leer
+    assert sorted(clean["anio"]) == [2022, 2023, 2024]
+    assert clean.set_index("anio").loc[2024, "tasa"] == 20.0
@@ -27,3 +27,24 @@ def test_task_clean_renta(tmp_path, monkeypatch):
 
     assert set(["codigo_postal", "municipio", "periodo", "renta_media"]).issubset(clean.columns)
     assert clean.loc[clean["codigo_postal"] == "28001", "renta_media"].iloc[0] == 13999.0
+
+
+def test_task_clean_renta_dataset_fallback_ignores_partitions(tmp_path, monkeypatch):
+    from task_load_raw import RawParquetLoader
+
+    drops = tmp_path / "data" / "renta"
+    drops.mkdir(parents=True)
+    # Sin columna "Total": se usa la última columna del CSV, no las particiones
+    for year, value in (("2020", "13.999"), ("2021", "14.321")):
+        (drops / f"renta_{year}.csv").write_text(
+            f"Municipios;Periodo;Importe\n28001 Acebeda, La;{year};{value}\n",
+            encoding="latin1",
+        )
+    monkeypatch.setenv("DATA_IN_DIR", str(tmp_path / "data"))
+    monkeypatch.setenv("DATA_OUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setenv("DATA_IN_RENTA", "renta")
+
+    RawParquetLoader().run(only="renta")
+    clean = pd.read_parquet(task_clean_renta()).sort_values("periodo")
+
+    assert clean["renta_media"].tolist() == [13999.0, 14321.0]
@@ -0,0 +1,101 @@
+import json
+from pathlib import Path
+
+from cli import build_plan, main, run_plan
+
+
+def test_cli_runs_full_pipeline(tmp_path: Path, data_in: Path, monkeypatch, capsys):
+    data_out = tmp_path / "output"
+    monkeypatch.setenv("DATA_IN_DIR", str(data_in))
+    monkeypatch.setenv("DATA_OUT_DIR", str(data_out))
+
+    rc = main(["--workers", "3", "--engine", "streaming", "--format", "json"])
+
+    summary = json.loads(capsys.readouterr().out)
+    assert rc == 0
+    assert set(summary["stages"]) == {
+        "load_renta",
+        "load_delitos",
+        "load_contact",
+        "clean_renta",
+        "clean_delitos",
+        "clean_contact",
+        "integrate",
+    }
+    assert all(s["status"] == "ok" for s in summary["stages"].values())
+    assert Path(summary["stages"]["integrate"]["output"]).exists()
+
+
+def test_cli_stage_and_source_selection(tmp_path: Path, data_in: Path, monkeypatch, capsys):
+    # main() escribe en os.environ; monkeypatch lo restaura al terminar
+    monkeypatch.delenv("DATA_IN_DIR", raising=False)
+    monkeypatch.delenv("DATA_OUT_DIR", raising=False)
+
+    rc = main(
+        [
+            "--stages",
+            "load_raw,clean",
+            "--sources",
+            "contact",
+            "--data-in",
+            str(data_in),
+            "--data-out",
+            str(tmp_path / "output"),
+        ]
+    )
+
+    out = capsys.readouterr().out
+    assert rc == 0
+    assert "load_contact" in out and "clean_contact" in out
+    assert "renta" not in out and "integrate" not in out
+    assert (tmp_path / "output" / "clean" / "contact_CLEAN.parquet").exists()
+
+
+def test_cli_multi_file_load_with_parallel_workers(
+    tmp_path: Path, data_in: Path, monkeypatch, capsys
+):
+    """Pool de procesos de la carga lanzado desde un hilo con otras etapas en marcha."""
+    drops = data_in / "contact"
+    drops.mkdir()
+    header = "sessionID;DNI;Telef;CP;duration_call_mins;funnel_Q;Producto\n"
+    for day in range(1, 7):
+        (drops / f"contact_2024-03-{day:02d}.csv").write_text(
+            header + f"b'S{day}';X{day};600;28001;2.5;Chalet;x\n", encoding="latin1"
+        )
+    monkeypatch.setenv("DATA_IN_DIR", str(data_in))
+    monkeypatch.setenv("DATA_OUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setenv("DATA_IN_CONTACT", "contact")
+
+    rc = main(["--workers", "4", "--load-workers", "4", "--format", "json"])
+
+    summary = json.loads(capsys.readouterr().out)
+    assert rc == 0, summary
+    assert summary["stages"]["load_contact"]["output"].endswith("contact_RAW")
+    assert len(list((tmp_path / "output" / "raw" / "contact_RAW").rglob("*.parquet"))) == 6
+
+
+def test_run_plan_skips_dependents_of_failed_stage(caplog):
+    def boom():
+        raise RuntimeError("fallo")
+
+    plan = build_plan(["clean", "integrate"], ["renta"])
+    plan["clean_renta"] = (boom, [])
+    results = run_plan(plan, workers=2)
+
+    assert results["clean_renta"]["status"] == "failed"
+    assert results["integrate"]["status"] == "skipped"
+    # el traceback completo queda en el log y en el resultado
+    assert "in boom" in results["clean_renta"]["traceback"]
+    assert "Traceback" in caplog.text and "clean_renta" in caplog.text
+
+
+def test_cli_profiles_each_stage(tmp_path: Path, data_in: Path, monkeypatch, capsys):
+    data_out = tmp_path / "output"
+    monkeypatch.setenv("DATA_IN_DIR", str(data_in))
+    monkeypatch.setenv("DATA_OUT_DIR", str(data_out))
+    monkeypatch.setenv("ETL_PROFILE", "1")
+
+    assert main(["--stages", "load_raw,clean", "--sources", "contact,delitos"]) == 0
+
+    reports = {p.name.split("-")[0] for p in (data_out / "profiles").glob("*.hot.txt")}
+    assert reports == {"load_contact", "load_delitos", "clean_contact", "clean_delitos"}
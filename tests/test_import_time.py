@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY = ("pandas", "pyarrow", "numpy")
+
+
+# airflow mínimo: lo justo para que dags/etl.py se pueda parsear sin el stack real
+FAKE_AIRFLOW = {
+    "airflow/__init__.py": """
+class DAG:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+""",
+    "airflow/models/__init__.py": "",
+    "airflow/models/param.py": """
+class Param:
+    def __init__(self, default=None, **kwargs):
+        self.default = default
+""",
+    "airflow/operators/__init__.py": "",
+    "airflow/operators/python.py": """
+class PythonOperator:
+    def __init__(self, task_id, python_callable, **kwargs):
+        self.task_id = task_id
+        self.python_callable = python_callable
+
+    def __rshift__(self, other):
+        return other
+""",
+}
+
+
+def _fake_airflow(root: Path) -> Path:
+    for rel, code in FAKE_AIRFLOW.items():
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).write_text(code)
+    return root
+
+
+def _importtime(code: str, *extra_path: Path) -> dict:
+    """Ejecuta `python -X importtime` y devuelve {módulo: tiempo acumulado en µs}."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(ROOT / "src"), str(ROOT / "dags"), *map(str, extra_path)]
+    )
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    mods = {}
+    for line in res.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        mods[name.strip()] = int(cumulative)
+    return mods
+
+
+def test_profiler_import_is_light():
+    # Es el único módulo de src que el DAG importa al parsear
+    mods = _importtime("import profiler")
+    assert not [m for m in mods if m.split(".")[0] in HEAVY]
+    assert mods["profiler"] < 500_000, f"import profiler: {mods['profiler'] / 1000:.0f} ms"
+
+
+def test_dag_parse_does_not_import_tasks(tmp_path: Path):
+    mods = _importtime("import etl", _fake_airflow(tmp_path / "fake"))
+    assert "etl" in mods
+    assert not [m for m in mods if m.startswith("task_")]
+    assert not [m for m in mods if m.split(".")[0] in HEAVY]
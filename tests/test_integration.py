@@ -42,3 +42,56 @@ def test_task_integrate(tmp_path, monkeypatch):
     final = pd.read_csv(p_final_csv())
     assert "renta_media" in final.columns
     assert "tasa" in final.columns
+
+
+def test_task_integrate_streaming_matches_in_memory(tmp_path, monkeypatch):
+    data_out = tmp_path / "output"
+    monkeypatch.setenv("DATA_OUT_DIR", str(data_out))
+    monkeypatch.setenv("ETL_CACHE", "0")
+
+    contact = pd.DataFrame(
+        {
+            "sessionID": ["A", "B", "C", "D", "E", "F"],
+            "CP": ["28001", "28002", "99999", "28001", None, "28003"],
+            "duration_call_mins": [2.5, 3.1, 1.0, 4.0, 0.5, 1.5],
+            "Chalet": [1, 0, 0, 1, 0, 1],
+        }
+    )
+    contact.to_parquet(p_clean_contact(), index=False)
+    pd.DataFrame(
+        {
+            "codigo_postal": ["28001", "28001", "28002", "28003"],
+            "municipio": ["Acebeda, La", "Acebeda, La", "Alcalá de Henares", "Ajalvir"],
+            "periodo": [2019, 2020, 2020, 2020],
+            "renta_media": [13000.0, 13999.0, 15500.0, 14000.0],
+        }
+    ).to_parquet(p_clean_renta(), index=False)
+    # Ajalvir (28003) no tiene delitos
+    pd.DataFrame(
+        {
+            "municipio": ["ACEBEDA, LA", "ACEBEDA, LA", "ALCALA DE HENARES"],
+            "anio": [2019, 2020, 2020],
+            "tipo_delito": ["total"] * 3,
+            "tasa": [100.0, 110.0, 28.0],
+        }
+    ).to_parquet(p_clean_delitos(), index=False)
+
+    def check(cps) -> pd.DataFrame:
+        contact[contact["CP"].isin(cps)].to_parquet(p_clean_contact(), index=False)
+        expected = Path(task_integrate(streaming=False)).read_bytes()
+        for batch_size, workers in ((1, 1), (2, 1), (1, 3)):
+            out = task_integrate(streaming=True, batch_size=batch_size, workers=workers)
+            assert Path(out).read_bytes() == expected
+        return pd.read_csv(p_final_csv(), dtype=str)
+
+    # Contactos sin renta: enteros a float, como el join en memoria de siempre
+    final = check(["28001", "28002", "99999", None])
+    assert set(final["periodo_renta"].dropna()) == {"2020.0"}
+    # Todos cruzan (aunque Ajalvir no tenga delitos en la dimensión): enteros intactos
+    final = check(["28001", "28002"])
+    assert set(final["periodo_renta"]) == {"2020"}
+    assert set(final["anio"]) == {"2019", "2020"}
+    # Renta completa pero un contacto sin delitos: solo anio pasa a float
+    final = check(["28001", "28003"])
+    assert set(final["periodo_renta"]) == {"2020"}
+    assert set(final["anio"].dropna()) == {"2019.0", "2020.0"}
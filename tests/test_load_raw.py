@@ -8,39 +8,9 @@ from paths import raw_dir  # idem
 from task_load_raw import RawParquetLoader  # importa desde el paquete
 
 
-def _write_minimal_inputs(data_in: Path) -> None:
-    data_in.mkdir(parents=True, exist_ok=True)
-
-    (data_in / "renta_por_hogar.csv").write_text(
-        "Municipios;Indicadores de renta media y mediana;Periodo;Total\n"
-        "28001 Acebeda, La;Renta neta media por persona;2020;13.999\n"
-        "28002 Ajalvir;Renta neta media por persona;2020;15.500\n",
-        encoding="latin1",
-    )
-    (data_in / "delitos_por_municipio.csv").write_text(
-        "Balance de criminalidad 2020 - 1er trimestre\n"
-        "Unidades: Tasas\n"
-        "Notas adicionales\n"
-        "Municipio;2019;2020;2021\n"
-        "MADRID (COMUNIDAD DE);100;110;120\n"
-        "ALCALÁ DE HENARES;30;28;35\n",
-        encoding="latin1",
-    )
-    (data_in / "contac_center_data.csv").write_text(
-        "sessionID;DNI;Telef;CP;duration_call_mins;funnel_Q;Producto\n"
-        "b'AAA';X1;600000001;28001;2.5;Chalet;\n"
-        "b'AAA';X1;600000001;28001;2.5;Unifamiliar;\n"
-        "b'AAA';X1;600000001;28001;2.5;Sin Rejas;Seguro Hogar\n"
-        "b'BBB';Y2;600000002;28002;3.1;Piso;\n",
-        encoding="latin1",
-    )
-
-
-def test_find_delitos_header_index(tmp_path: Path):
+def test_find_delitos_header_index(data_in: Path):
     from task_load_raw import _find_delitos_header_index
 
-    data_in = tmp_path / "data"
-    _write_minimal_inputs(data_in)
     delitos_path = data_in / "delitos_por_municipio.csv"
 
     with open(delitos_path, "r", encoding="latin1", errors="replace") as fh:
@@ -49,11 +19,9 @@ def test_find_delitos_header_index(tmp_path: Path):
     assert idx == 3  # línea 4 (índice 3) es la cabecera en el fixture
 
 
-def test_run_all_creates_nonempty_parquets(tmp_path: Path, monkeypatch):
+def test_run_all_creates_nonempty_parquets(tmp_path: Path, data_in: Path, monkeypatch):
     """run('all') crea los 3 RAW y se pueden leer con pandas."""
-    data_in = tmp_path / "data"
     data_out = tmp_path / "output"
-    _write_minimal_inputs(data_in)
 
     monkeypatch.setenv("DATA_IN_DIR", str(data_in))
     monkeypatch.setenv("DATA_OUT_DIR", str(data_out))
@@ -94,10 +62,8 @@ def test_run_all_creates_nonempty_parquets(tmp_path: Path, monkeypatch):
         ("contact", "contact_RAW.parquet"),
     ],
 )
-def test_run_only_each_source(tmp_path: Path, monkeypatch, only: str, filename: str):
-    data_in = tmp_path / "data"
+def test_run_only_each_source(tmp_path: Path, data_in: Path, monkeypatch, only: str, filename: str):
     data_out = tmp_path / "output"
-    _write_minimal_inputs(data_in)
 
     monkeypatch.setenv("DATA_IN_DIR", str(data_in))
     monkeypatch.setenv("DATA_OUT_DIR", str(data_out))
@@ -109,3 +75,114 @@ def test_run_only_each_source(tmp_path: Path, monkeypatch, only: str, filename:
     assert set(outputs_one.keys()) == {only}
     df = pd.read_parquet(data_out / "raw" / filename)
     assert not df.empty
+
+
+def test_run_contact_multi_file_dataset(tmp_path: Path, data_in: Path, monkeypatch):
+    """Con un directorio de CSV se escribe un dataset RAW particionado por fichero/periodo."""
+    data_out = tmp_path / "output"
+    drops = data_in / "contact"
+    drops.mkdir()
+    header = "sessionID;DNI;Telef;CP;duration_call_mins;funnel_Q;Producto\n"
+    (drops / "contact_2024-03-14.csv").write_text(
+        header + "b'AAA';X1;600000001;28001;2.5;Chalet;\n", encoding="latin1"
+    )
+    (drops / "contact_2024-03-15.csv").write_text(
+        header + "b'BBB';Y2;600000002;28002;3.1;Piso;\n", encoding="latin1"
+    )
+
+    monkeypatch.setenv("DATA_IN_DIR", str(data_in))
+    monkeypatch.setenv("DATA_OUT_DIR", str(data_out))
+    monkeypatch.setenv("DATA_IN_CONTACT", "contact")
+
+    loader = RawParquetLoader(chunksize=5_000, compression_level=3, workers=2)
+    outputs = loader.run(only="contact")
+
+    dataset = data_out / "raw" / "contact_RAW"
+    assert outputs["contact"] == str(dataset)
+    assert not (data_out / "raw" / "contact_RAW.parquet").exists()
+
+    df = pd.read_parquet(dataset)
+    assert len(df) == 2
+    assert set(df["source_file"].astype(str)) == {
+        "contact_2024-03-14.csv",
+        "contact_2024-03-15.csv",
+    }
+    assert set(df["period"].astype(str)) == {"2024-03-14", "2024-03-15"}
+
+
+def test_same_basename_in_subdirs_gets_distinct_fragments(
+    tmp_path: Path, data_in: Path, monkeypatch
+):
+    from task_load_raw import read_raw
+
+    header = "sessionID;DNI;Telef;CP;duration_call_mins;funnel_Q;Producto\n"
+    for day, sid in (("2024-03-14", "AAA"), ("2024-03-15", "BBB")):
+        (data_in / "drops" / day).mkdir(parents=True)
+        (data_in / "drops" / day / "contact.csv").write_text(
+            header + f"b'{sid}';X1;600000001;28001;2.5;Chalet;\n", encoding="latin1"
+        )
+    monkeypatch.setenv("DATA_IN_DIR", str(data_in))
+    monkeypatch.setenv("DATA_OUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setenv("DATA_IN_CONTACT", "drops/*/contact.csv")
+
+    df = read_raw(Path(RawParquetLoader().run(only="contact")["contact"]))
+    assert sorted(df["sessionID"]) == ["AAA", "BBB"]
+    assert sorted(df["source_file"]) == ["2024-03-14__contact.csv", "2024-03-15__contact.csv"]
+
+
+def test_read_raw_unifies_fragment_schemas(tmp_path: Path):
+    from task_load_raw import read_raw_table
+
+    dataset = tmp_path / "x_RAW"
+    for name, df in (
+        ("a.csv", pd.DataFrame({"k": ["x"], "n": [1], "p": [float("nan")]})),
+        ("b.csv", pd.DataFrame({"k": ["y"], "n": [2.5], "p": ["texto"], "extra": [7]})),
+    ):
+        part = dataset / f"source_file={name}" / "period=unknown"
+        part.mkdir(parents=True)
+        df.to_parquet(part / "part-0.parquet", index=False)
+
+    table = read_raw_table(dataset)
+    assert table.column_names == ["k", "n", "p", "extra", "source_file", "period"]
+    assert table.column("n").to_pylist() == [1.0, 2.5]
+    assert table.column("p").to_pylist() == [None, "texto"]
+    assert table.column("extra").to_pylist() == [None, 7]
+
+
+def test_pipelined_writer_matches_serial(tmp_path: Path, data_in: Path, monkeypatch):
+    monkeypatch.setenv("DATA_IN_DIR", str(data_in))
+
+    monkeypatch.setenv("DATA_OUT_DIR", str(tmp_path / "serial"))
+    RawParquetLoader(chunksize=1, compression_level=3).run(only="renta")
+    monkeypatch.setenv("DATA_OUT_DIR", str(tmp_path / "piped"))
+    loader = RawParquetLoader(chunksize=1, compression_level=3, pipelined=True, queue_size=1)
+    loader.run(only="renta")
+
+    serial = pd.read_parquet(tmp_path / "serial" / "raw" / "renta_RAW.parquet")
+    piped = pd.read_parquet(tmp_path / "piped" / "raw" / "renta_RAW.parquet")
+    pd.testing.assert_frame_equal(serial, piped)
+    assert {"parse", "convert", "write", "wall"} <= set(loader.timings["renta"])
+
+
+def test_pipelined_writer_propagates_parse_errors(tmp_path: Path):
+    from task_load_raw import _parquet_stream_write_pipelined
+
+    def chunks():
+        yield pd.DataFrame({"a": [1]})
+        raise ValueError("CSV roto")
+
+    with pytest.raises(ValueError, match="CSV roto"):
+        _parquet_stream_write_pipelined(chunks(), tmp_path / "x.parquet")
+
+
+def test_bad_input_glob_keeps_previous_raw(tmp_path: Path, data_in: Path, monkeypatch):
+    data_out = tmp_path / "output"
+    monkeypatch.setenv("DATA_IN_DIR", str(data_in))
+    monkeypatch.setenv("DATA_OUT_DIR", str(data_out))
+
+    RawParquetLoader().run(only="contact")
+    monkeypatch.setenv("DATA_IN_CONTACT", "typo/*.csv")
+    with pytest.raises(FileNotFoundError):
+        RawParquetLoader().run(only="contact")
+
+    assert not pd.read_parquet(data_out / "raw" / "contact_RAW.parquet").empty
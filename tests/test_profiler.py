@@ -0,0 +1,52 @@
+import logging
+
+from profiler import profiling_enabled, run_profiled
+
+
+def _work(n: int) -> int:
+    data = [str(i) for i in range(n)]
+    return len(data)
+
+
+def test_profiling_disabled_by_default(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATA_OUT_DIR", str(tmp_path / "output"))
+    monkeypatch.delenv("ETL_PROFILE", raising=False)
+
+    assert not profiling_enabled()
+    assert run_profiled("work", _work, 10) == 10
+    assert not (tmp_path / "output" / "profiles").exists()
+
+
+def test_profiling_writes_reports_and_logs(tmp_path, monkeypatch, caplog):
+    monkeypatch.setenv("DATA_OUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setenv("ETL_PROFILE", "1")
+
+    with caplog.at_level(logging.INFO, logger="profiler"):
+        assert run_profiled("work", _work, 10_000) == 10_000
+    # el parámetro explícito del DAG tiene prioridad sobre el env
+    assert run_profiled("off", _work, 10, profile=False) == 10
+
+    files = sorted(p.name for p in (tmp_path / "output" / "profiles").iterdir())
+    assert [f.split(".", 1)[1] for f in files] == ["alloc.txt", "hot.txt", "prof"]
+    hot = next((tmp_path / "output" / "profiles").glob("*.hot.txt")).read_text()
+    assert "_work" in hot
+    assert "[profile] work" in caplog.text
+
+
+def test_report_failure_does_not_mask_task_error(tmp_path, monkeypatch, caplog):
+    import pytest
+
+    import profiler
+
+    monkeypatch.setenv("DATA_OUT_DIR", str(tmp_path / "output"))
+
+    def broken_reports(*args, **kwargs):
+        raise OSError("disco lleno")
+
+    def failing_task():
+        raise ValueError("fallo real")
+
+    monkeypatch.setattr(profiler, "_write_reports", broken_reports)
+    with pytest.raises(ValueError, match="fallo real"):
+        run_profiled("t", failing_task, profile=True)
+    assert "no se pudieron escribir los informes" in caplog.text
@@ -0,0 +1,89 @@
+from pathlib import Path
+
+import pytest
+
+from paths import cache_dir
+from result_cache import cached_artifact
+
+
+def _writer(calls: list, content: str):
+    def build(tmp: Path) -> None:
+        calls.append(tmp)
+        tmp.write_text(content)
+
+    return build
+
+
+def test_cache_hit_skips_build_and_restores_output(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("DATA_OUT_DIR", str(tmp_path / "output"))
+    src = tmp_path / "in.txt"
+    src.write_text("a")
+    out = tmp_path / "out.txt"
+    calls: list = []
+
+    assert cached_artifact("t", [src], out, _writer(calls, "v1")) == str(out)
+    out.unlink()
+    assert cached_artifact("t", [src], out, _writer(calls, "v2")) == str(out)
+
+    assert len(calls) == 1
+    assert out.read_text() == "v1"
+
+    # input distinto -> miss
+    src.write_text("b")
+    cached_artifact("t", [src], out, _writer(calls, "v3"))
+    assert len(calls) == 2 and out.read_text() == "v3"
+
+
+def test_failed_build_keeps_previous_output(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("DATA_OUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setenv("ETL_CACHE", "0")
+    src = tmp_path / "in.txt"
+    src.write_text("a")
+    out = tmp_path / "out.txt"
+    out.write_text("previo")
+
+    def boom(tmp: Path) -> None:
+        tmp.write_text("a medias")
+        raise RuntimeError("fallo")
+
+    with pytest.raises(RuntimeError):
+        cached_artifact("t", [src], out, boom)
+
+    assert out.read_text() == "previo"
+    assert [p.name for p in tmp_path.iterdir() if p.name.endswith(".tmp")] == []
+
+
+def test_lru_cap_evicts_oldest(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("DATA_OUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setenv("ETL_CACHE_MAX_MB", str(1.5 / 1024))  # ~1.5 KiB
+    out = tmp_path / "out.bin"
+    calls: list = []
+
+    def build(tmp: Path) -> None:
+        calls.append(tmp)
+        tmp.write_bytes(b"x" * 1024)
+
+    for i in [0, 1, 2, 2, 0]:
+        src = tmp_path / f"in{i}.txt"
+        src.write_text(str(i))
+        cached_artifact("t", [src], out, build)
+
+    # solo sobrevive el último; in2 repetido es hit, in0 fue desalojado
+    assert len(list(cache_dir().iterdir())) == 1
+    assert len(calls) == 4
+
+
+def test_key_includes_tag_and_code(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("DATA_OUT_DIR", str(tmp_path / "output"))
+    src = tmp_path / "in.txt"
+    src.write_text("a")
+    code = tmp_path / "task.py"
+    code.write_text("x = 1")
+    out = tmp_path / "out.txt"
+    calls: list = []
+
+    cached_artifact("t", [src], out, _writer(calls, "v1"), code=[code], tag="memory")
+    cached_artifact("t", [src], out, _writer(calls, "v2"), code=[code], tag="streaming")
+    code.write_text("x = 2")
+    cached_artifact("t", [src], out, _writer(calls, "v3"), code=[code], tag="memory")
+    assert len(calls) == 3